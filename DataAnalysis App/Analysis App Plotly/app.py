@@ -1,6 +1,11 @@
 import dash
 import flask
 import dash_bootstrap_components as dbc
+import plotly.io as pio
+
+# Serialize callback responses (figures, tables) with orjson, which encodes NumPy arrays
+# natively instead of boxing each value into a Python object first
+pio.json.config.default_engine = 'orjson'
 
 # Initialize Flask server
 server = flask.Flask(__name__)
@@ -1,11 +1,14 @@
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output, State
-import pandas as pd
-import base64
+import flask
+import hashlib
 import io
+from collections import defaultdict
+from pyarrow import csv as pacsv
 
-from app import app
+from app import app, server
+from utils.store import STEP_PREFIX, delete_frame, set_frame, stored_meta
 from pages import home, preprocessing, univariate, bivariate
 
 # --- Navigation Bar Layout ---
@@ -37,7 +40,8 @@ NAV_BAR = html.Nav(
 
 # --- Global Data Store (dcc.Store) ---
 # A dcc.Store component is used to share data (the uploaded DataFrame) across pages.
-# It stores data in the browser's memory.
+# It only holds the key of the DataFrame persisted on the server and its column metadata
+# (names, dtypes, null counts), not the data itself.
 GLOBAL_STORE = dcc.Store(id='stored-data', storage_type='session')
 
 app.layout = html.Div([
@@ -63,32 +67,97 @@ def display_page(pathname):
     else:
         return html.Div([html.H1('404'), html.P('Page not found')])
 
-# --- Data Upload and Storage Callback (Defined in index.py to share data) ---
-# This callback parses the uploaded file content and stores the resulting DataFrame (as JSON string)
-# in the dcc.Store component.
-@app.callback(
-    Output('stored-data', 'data'),
-    Input('upload-data', 'contents'),
-    State('upload-data', 'filename')
-)
-def store_data(contents, filename):
+# --- Data Upload and Storage (Defined in index.py to share data) ---
+# The file is posted as raw multipart bytes to a Flask route instead of travelling as a base64
+# string inside a Dash callback. The route keeps the parsed DataFrame in the server-side data
+# store and only its key (and the column metadata) go into the dcc.Store component.
+def unique_names(names):
+    """Header names as pd.read_csv gives them: 'Unnamed: <i>' for blanks, 'a', 'a.1', ... for repeats."""
+    names = [name if name != '' else f"Unnamed: {i}" for i, name in enumerate(names)]
+    header, counts = set(names), defaultdict(int)
+    for i, name in enumerate(names):
+        count = counts[name]
+        new_name = name
+        # Skip suffixes that are already taken or appear elsewhere in the header
+        while count > 0:
+            counts[name] = count + 1
+            new_name = f"{name}.{count}"
+            count = count + 1 if new_name in header else counts[new_name]
+        names[i] = new_name
+        counts[new_name] = count + 1
+    return names
+
+def parse_csv(data):
+    """Parses raw CSV bytes into a DataFrame."""
+    # Arrow's multi-threaded C++ reader parses the raw bytes directly (no intermediate str)
+    table = pacsv.read_csv(
+        io.BytesIO(data),
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20),
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True) # Empty text cells -> NaN, like pandas
+    )
+    # Arrow keeps blank and repeated header names, which Parquet and the dropdowns cannot handle
+    table = table.rename_columns(unique_names(table.column_names))
+    df = table.to_pandas(date_as_object=False)
+    # Low-cardinality text columns (gender, country, ...) become categoricals: a small code per
+    # row instead of a Python string, which shrinks the stored file and speeds up counts/encoding.
+    text_cols = df.select_dtypes(include='object').columns
+    low_card = [c for c in text_cols if len(df) and df[c].nunique() / len(df) < 0.5]
+    return df.astype({c: 'category' for c in low_card})
+
+@server.route('/upload', methods=['POST'])
+def upload():
     """
-    Parses the uploaded CSV file and stores the data as a JSON string in the global store.
+    Parses the uploaded CSV file, persists the DataFrame server-side and returns its key.
     """
-    if contents is None:
-        return None
-
-    content_type, content_string = contents.split(',')
-    decoded = base64.b64decode(content_string)
+    f = flask.request.files['file']
+    data = f.read()
 
     try:
-        # Assume CSV file uploaded
-        df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-        # Convert DataFrame to JSON (optimized for storage)
-        return df.to_json(date_format='iso', orient='split')
+        # Same file -> same key, so re-uploading a file reuses the stored DataFrame (no parse, no write)
+        key = hashlib.blake2b(data).hexdigest()
+        meta = stored_meta(key)
+        if meta is None:
+            # Assume CSV file uploaded
+            meta = set_frame(key, parse_csv(data))
+        # The session's processed version of its previous file is no longer reachable
+        previous = flask.request.form.get('previous', '')
+        if previous.startswith(STEP_PREFIX): delete_frame(previous)
+        return {'key': key, **meta, 'filename': f.filename}
     except Exception as e:
         print(f"Error processing file: {e}")
-        return None # Return None if parsing fails
+        return {'error': str(e), 'filename': f.filename}, 400
+
+# dcc.Upload hands the file over as a data URL. The browser turns it back into binary and
+# posts it to /upload, so the base64 text never reaches the server.
+app.clientside_callback(
+    """
+    async function(contents, filename, store) {
+        var noUpdate = window.dash_clientside.no_update;
+        if (!contents) { return [noUpdate, noUpdate]; }
+
+        var blob = await (await fetch(contents)).blob();
+        var form = new FormData();
+        form.append('file', blob, filename);
+        if (store && store.key) { form.append('previous', store.key); }
+
+        try {
+            var response = await fetch('/upload', {method: 'POST', body: form});
+            var result = await response.json();
+            if (!response.ok) { return [noUpdate, result]; }
+            var store = {key: result.key, rows: result.rows, cols: result.cols, num_cols: result.num_cols,
+                         cat_cols: result.cat_cols, dtypes: result.dtypes, nulls: result.nulls};
+            return [store, result];
+        } catch (e) {
+            return [noUpdate, {error: String(e), filename: filename}];
+        }
+    }
+    """,
+    Output('stored-data', 'data'),
+    Output('upload-response', 'data'),
+    Input('upload-data', 'contents'),
+    State('upload-data', 'filename'),
+    State('stored-data', 'data')
+)
 
 # --- Run the App ---
 if __name__ == '__main__':
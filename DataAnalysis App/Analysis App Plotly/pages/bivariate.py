@@ -1,9 +1,64 @@
 from dash import dcc, html
 from dash.dependencies import Input, Output
 import pandas as pd
+import numpy as np
 import plotly.express as px
 
 from app import app # Import the app instance
+from utils.store import load_frame # Shared stored-data reader
+
+# --- Downsampling Limits ---
+# Above these sizes the browser spends most of its time drawing points nobody can tell apart.
+MAX_LINE_POINTS = 3000
+MAX_SCATTER_POINTS = 10000
+# Above this many points plots use WebGL and skip the animated transition
+WEBGL_THRESHOLD = 2000
+
+# --- Helper Functions ---
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: picks n_out row positions that keep the visual shape
+    of the line (peaks and dips) from x/y arrays already sorted by x.
+    """
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+
+    bucket_size = (n - 2) / (n_out - 2)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0  # Point selected in the previous bucket
+
+    for i in range(n_out - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+
+        # Average of the next bucket acts as the third triangle corner
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        idx[i + 1] = a
+
+    return idx
+
+def downsample_line(df, x_col, y_col):
+    """Reduces an x-sorted DataFrame to at most MAX_LINE_POINTS rows using LTTB."""
+    if len(df) <= MAX_LINE_POINTS or not pd.api.types.is_numeric_dtype(df[y_col]):
+        return df
+
+    df = df.dropna(subset=[x_col, y_col])
+    if pd.api.types.is_datetime64_any_dtype(df[x_col]):
+        x = df[x_col].array.asi8.astype(float) # Epoch integers; works for naive and tz-aware columns
+    elif pd.api.types.is_numeric_dtype(df[x_col]):
+        x = df[x_col].to_numpy(dtype=float)
+    else:
+        x = np.arange(len(df), dtype=float) # Text X-axis: use the plotting order
+    y = df[y_col].to_numpy(dtype=float)
+
+    return df.iloc[lttb_indices(x, y, MAX_LINE_POINTS)]
 
 layout = html.Div([
     html.H2('📉 Bivariate Analysis', className='mb-4'),
@@ -44,23 +99,21 @@ layout = html.Div([
     ], className='card p-3 shadow-sm')
 ])
 
-# --- Callback 1: Populate Dropdown Options ---
-@app.callback(
+# --- Callback 1: Populate Dropdown Options (Clientside) ---
+# The store already carries the column names, so the options are built in the browser
+# without loading the DataFrame on the server.
+app.clientside_callback(
+    """
+    function(store) {
+        if (!store) { return [[], []]; }
+        var options = store.cols.map(function(c) { return {label: c, value: c}; });
+        return [options, options];
+    }
+    """,
     Output('bivariate-x-select', 'options'),
     Output('bivariate-y-select', 'options'),
     [Input('stored-data', 'data')]
 )
-def set_column_options(json_data):
-    """Retrieves data and populates both X and Y dropdowns with column names."""
-    if json_data is None:
-        return [], []
-    
-    try:
-        df = pd.read_json(json_data, orient='split')
-        options = [{'label': col, 'value': col} for col in df.columns]
-        return options, options
-    except Exception:
-        return [], []
 
 # --- Callback 2: Generate Bivariate Plot ---
 @app.callback(
@@ -72,38 +125,50 @@ def set_column_options(json_data):
         Input('stored-data', 'data')
     ]
 )
-def generate_bivariate_plot(x_col, y_col, plot_type, json_data):
+def generate_bivariate_plot(x_col, y_col, plot_type, store):
     """Generates a scatter or line plot based on user selection."""
     
     # Check if data or necessary columns are selected
-    if json_data is None or x_col is None or y_col is None:
+    if store is None or x_col is None or y_col is None:
         return {}
 
     try:
-        df = pd.read_json(json_data, orient='split')
+        # Only the two plotted columns are read from the stored Parquet file
+        df = load_frame(store['key'], columns=tuple(dict.fromkeys([x_col, y_col])))
         
         if plot_type == 'scatter':
+            if len(df) > MAX_SCATTER_POINTS:
+                # Random sample keeps the point cloud's density
+                df = df.sample(MAX_SCATTER_POINTS, random_state=0)
+            render_mode = 'webgl' if len(df) > WEBGL_THRESHOLD else 'svg'
             fig = px.scatter(
                 df, 
                 x=x_col, 
                 y=y_col, 
                 title=f'Scatter Plot: {x_col} vs {y_col}',
-                height=550
+                height=550,
+                render_mode=render_mode
             )
         elif plot_type == 'line':
             # Note: Plotly Express's line plot can be used for general data, 
             # though it's typically best for data ordered by an index or time.
+            # Sort by X for a cleaner line path (df only holds the two plotted columns)
+            df = downsample_line(df.sort_values(by=x_col, kind='mergesort'), x_col, y_col)
+            render_mode = 'webgl' if len(df) > WEBGL_THRESHOLD else 'svg'
             fig = px.line(
-                df.sort_values(by=x_col), # Sort by X for a cleaner line path
+                df,
                 x=x_col, 
                 y=y_col, 
                 title=f'Line Plot: {x_col} vs {y_col}',
-                height=550
+                height=550,
+                render_mode=render_mode
             )
         else:
             return {}
 
-        fig.update_layout(transition_duration=500)
+        # Animating every point on large plots only slows the browser down
+        if render_mode == 'svg':
+            fig.update_layout(transition_duration=500)
         return fig
         
     except Exception as e:
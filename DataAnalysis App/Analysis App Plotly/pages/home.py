@@ -1,9 +1,6 @@
 from dash import dcc, html, callback
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output
 import dash_bootstrap_components as dbc
-import pandas as pd
-import base64
-import io
 
 # --- Layout ---
 layout = html.Div(
@@ -34,6 +31,9 @@ layout = html.Div(
             multiple=False
         ),
         
+        # Response of the /upload route (written by the upload callback in index.py)
+        dcc.Store(id='upload-response'),
+
         # This Div will show the Success Message or Error
         html.Div(id='upload-success-message', className='mt-4')
     ]
@@ -43,34 +43,26 @@ layout = html.Div(
 # This runs separately from the index.py storage callback just to update the UI
 @callback(
     Output('upload-success-message', 'children'),
-    [Input('upload-data', 'contents')],
-    [State('upload-data', 'filename')]
+    [Input('upload-response', 'data')]
 )
-def update_output(contents, filename):
-    if contents is None:
+def update_output(response):
+    if response is None:
         return html.Div("Waiting for file...", style={'color': 'gray', 'fontStyle': 'italic'})
 
-    try:
-        content_type, content_string = contents.split(',')
-        decoded = base64.b64decode(content_string)
-        
-        # Read the file just to get stats (Row/Col count)
-        df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-
-        # --- THE FIX IS HERE ---
-        # We use f-strings (f"...") to automatically handle numbers and text together.
-        rows = df.shape[0]
-        cols = df.shape[1]
-
-        return html.Div([
-            html.H4("✅ File Uploaded Successfully!", className="text-success"),
-            html.P(f"Filename: {filename}"),
-            html.P(f"Dataset contains {rows} rows and {cols} columns."),
-            dbc.Button("Go to Preprocessing", href="/preprocessing", color="primary", className="mt-2")
-        ], className="alert alert-success", style={'maxWidth': '600px', 'margin': '20px auto'})
-
-    except Exception as e:
+    if 'error' in response:
         return html.Div([
             html.H5("❌ Error processing file"),
-            html.P(str(e))
-        ], className="alert alert-danger")
\ No newline at end of file
+            html.P(response['error'])
+        ], className="alert alert-danger")
+
+    # --- THE FIX IS HERE ---
+    # We use f-strings (f"...") to automatically handle numbers and text together.
+    rows = response['rows']
+    cols = len(response['cols'])
+
+    return html.Div([
+        html.H4("✅ File Uploaded Successfully!", className="text-success"),
+        html.P(f"Filename: {response['filename']}"),
+        html.P(f"Dataset contains {rows} rows and {cols} columns."),
+        dbc.Button("Go to Preprocessing", href="/preprocessing", color="primary", className="mt-2")
+    ], className="alert alert-success", style={'maxWidth': '600px', 'margin': '20px auto'})
\ No newline at end of file
@@ -1,24 +1,46 @@
-from dash import dcc, html, dash_table, callback_context
+from dash import dcc, html, dash_table, callback_context, Patch
 from dash.dependencies import Input, Output, State
 import pandas as pd
 import numpy as np
 import dash
-import io
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MinMaxScaler, StandardScaler, RobustScaler, LabelEncoder
+import math
+import os
+import uuid
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from numba import guvectorize, njit
+from sklearn.preprocessing import MinMaxScaler, StandardScaler, RobustScaler
 
 from app import app
+from utils.store import STEP_PREFIX, delete_frame, frame_path, load_frame, set_frame, to_arrow
 
-# --- Helper Function ---
-def parse_data(json_data):
-    if json_data is None: return None
+# --- Helper Functions ---
+def parse_data(store):
+    if store is None: return None
     try:
-        # Wrap string in io.StringIO to fix FutureWarning
-        return pd.read_json(io.StringIO(json_data), orient='split')
+        # The store only holds a key; the DataFrame itself lives in the server-side data store
+        return load_frame(store['key'])
     except Exception as e:
-        print(f"Error parsing data: {e}")
+        print(f"Error loading data: {e}")
         return None
 
+def save_data(df, store):
+    # Every processed version gets a fresh key; there is no undo, so the version it replaces is deleted
+    # (the uploaded file, keyed by its hash, is kept: re-uploading it skips the CSV parse and write)
+    key = STEP_PREFIX + uuid.uuid4().hex
+    meta = set_frame(key, df)
+    if store.get('key', '').startswith(STEP_PREFIX): delete_frame(store['key'])
+    # Partial update: only send the store fields that actually changed
+    patch = Patch()
+    patch['key'] = key
+    for field, value in meta.items():
+        if value != store.get(field): patch[field] = value
+    return patch
+
+SCALERS = {'minmax': MinMaxScaler, 'standard': StandardScaler, 'robust': RobustScaler}
+
 # --- Layout ---
 layout = html.Div([
     
@@ -35,6 +57,9 @@ layout = html.Div([
     # Alert Box for Status Messages
     html.Div(id='preprocessing-alert'),
 
+    # Pending preprocessing action (written by the clientside dispatcher, read by process_data)
+    dcc.Store(id='action-request'),
+
     # --- TABS ---
     dcc.Tabs(id="preprocessing-tabs", value='tab-info', children=[
         dcc.Tab(label='1. Info', value='tab-info'),
@@ -206,19 +231,79 @@ layout = html.Div([
 
 # --- CALL BACKS ---
 
-# 1. Tab Visibility Logic
-@app.callback(
-    [Output(f'content-{name}', 'style') for name in ['info', 'missing', 'types', 'columns', 'clean-cat', 'discretize', 'normalize', 'encode', 'split']],
+# 1. Tab Visibility Logic (Clientside: runs in the browser, no server round-trip per tab click)
+TAB_NAMES = ['info', 'missing', 'types', 'columns', 'clean-cat', 'discretize', 'normalize', 'encode', 'split']
+app.clientside_callback(
+    """
+    function(tab) {
+        var show = {display: 'block', padding: '20px', border: '1px solid #ddd', borderTop: 'none'};
+        var hide = {display: 'none'};
+        var names = %s;
+        return names.map(function(n) { return 'tab-' + n === tab ? show : hide; });
+    }
+    """ % TAB_NAMES,
+    [Output(f'content-{name}', 'style') for name in TAB_NAMES],
     [Input('preprocessing-tabs', 'value')]
 )
-def tab_visibility(tab):
-    tabs = ['tab-info', 'tab-missing', 'tab-types', 'tab-columns', 'tab-clean-cat', 'tab-discretize', 'tab-normalize', 'tab-encode', 'tab-split']
-    return [{'display': 'block', 'padding': '20px', 'border': '1px solid #ddd', 'borderTop': 'none'} if tab == t else {'display': 'none'} for t in tabs]
 
-# 2. Populate Dropdowns & Info Table
+# 2a. Info Table
+# Custom paging: the browser only ever receives the SUMMARY_PAGE_SIZE rows on screen
+SUMMARY_PAGE_SIZE = 10
+
+def summary_records(store, start=0, stop=None):
+    # Built straight from the column metadata in the store: no DataFrame is loaded or scanned
+    return [{'Column': c, 'Type': t, 'Nulls': n}
+            for c, t, n in zip(store['cols'][start:stop], store['dtypes'][start:stop], store['nulls'][start:stop])]
+
 @app.callback(
-    [Output('data-summary-table', 'children'),
-     Output('missing-col-dropdown', 'options'),
+    Output('data-summary-table', 'children'),
+    [Input('stored-data', 'data')]
+)
+def update_summary(store):
+    if store is None: return html.Div("Please upload data first.")
+    if 'nulls' not in store: return html.Div("Error loading data.")
+    
+    return html.Div([
+        html.H5(f"Dataset Shape: {store['rows']} Rows, {len(store['cols'])} Columns"),
+        dash_table.DataTable(
+            id='summary-table',
+            data=summary_records(store, 0, SUMMARY_PAGE_SIZE),
+            columns=[{'name': i, 'id': i} for i in ['Column', 'Type', 'Nulls']],
+            page_action='custom', page_current=0, page_size=SUMMARY_PAGE_SIZE,
+            page_count=math.ceil(len(store['cols']) / SUMMARY_PAGE_SIZE),
+            style_table={'overflowX': 'auto'}
+        )
+    ])
+
+@app.callback(
+    Output('summary-table', 'data'),
+    [Input('summary-table', 'page_current')],
+    [State('stored-data', 'data')],
+    prevent_initial_call=True
+)
+def update_summary_page(page, store):
+    if store is None or page is None: raise dash.exceptions.PreventUpdate
+    start = page * SUMMARY_PAGE_SIZE
+    return summary_records(store, start, start + SUMMARY_PAGE_SIZE)
+
+# 2b. Populate Dropdowns
+# The options only depend on the column metadata in the store, so the lists are built in the browser
+app.clientside_callback(
+    """
+    function(store) {
+        if (!store || !store.cols) { return [[], [], [], [], [], [], [], []]; }
+        var opt = function(c) { return {label: c, value: c}; };
+        var dtypes = store.dtypes || [], nulls = store.nulls || [];
+        var allCols = store.cols.map(opt);
+        var typeCols = store.cols.map(function(c, i) { return {label: c + ' (' + dtypes[i] + ')', value: c}; });
+        var missingCols = [];
+        store.cols.forEach(function(c, i) { if (nulls[i] > 0) { missingCols.push({label: c + ' (' + nulls[i] + ' missing)', value: c}); } });
+        var numCols = (store.num_cols || []).map(opt);
+        var catCols = (store.cat_cols || []).map(opt);
+        return [missingCols, typeCols, allCols, allCols, numCols, numCols, catCols, allCols];
+    }
+    """,
+    [Output('missing-col-dropdown', 'options'),
      Output('type-col-dropdown', 'options'),
      Output('drop-col-dropdown', 'options'),
      Output('clean-cat-col-dropdown', 'options'),
@@ -228,39 +313,26 @@ def tab_visibility(tab):
      Output('split-target-dropdown', 'options')],
     [Input('stored-data', 'data')]
 )
-def populate_options(json_data):
-    if json_data is None: return html.Div("Please upload data first."), [], [], [], [], [], [], [], []
-    
-    df = parse_data(json_data)
-    if df is None: return html.Div("Error loading data."), [], [], [], [], [], [], [], []
-    
-    # Info Table
-    summary = pd.DataFrame({'Column': df.columns, 'Type': df.dtypes.astype(str), 'Nulls': df.isnull().sum()})
-    info_table = html.Div([
-        html.H5(f"Dataset Shape: {df.shape[0]} Rows, {df.shape[1]} Columns"),
-        dash_table.DataTable(data=summary.to_dict('records'), columns=[{'name': i, 'id': i} for i in summary.columns], page_size=10, style_table={'overflowX': 'auto'})
-    ])
-
-    all_cols = [{'label': c, 'value': c} for c in df.columns]
-    num_cols = [{'label': c, 'value': c} for c in df.select_dtypes(include=np.number).columns]
-    cat_cols = [{'label': c, 'value': c} for c in df.select_dtypes(exclude=np.number).columns]
-    
-    return info_table, all_cols, all_cols, all_cols, all_cols, num_cols, num_cols, cat_cols, all_cols
 
 # 3. Populate "Clean Categories" Specific Options (With FIX)
+CLEAN_CAT_MAX_VALUES = 500
+
 @app.callback(
     [Output('clean-cat-value-counts', 'children'),
      Output('clean-cat-bad-value', 'options')],
     [Input('clean-cat-col-dropdown', 'value'),
      Input('stored-data', 'data')]
 )
-def update_clean_cat_options(col, json_data):
-    if json_data is None or col is None: return "", []
-    df = parse_data(json_data)
+def update_clean_cat_options(col, store):
+    if store is None or col is None: return "", []
+    df = parse_data(store)
+    if df is None or col not in df.columns: return "", []
     
-    # Value Counts Table
-    counts = df[col].value_counts().reset_index()
-    counts.columns = ['Value', 'Count']
+    # One value_counts pass gives both the table and the (non-null) dropdown values;
+    # zero counts (unused categories) are dropped and high-cardinality columns are capped
+    vc = df[col].value_counts(dropna=True)
+    vc = vc[vc > 0].head(CLEAN_CAT_MAX_VALUES)
+    counts = vc.rename_axis('Value').reset_index(name='Count')
     table = dash_table.DataTable(
         data=counts.to_dict('records'), 
         columns=[{'name': i, 'id': i} for i in counts.columns], 
@@ -268,16 +340,198 @@ def update_clean_cat_options(col, json_data):
         style_header={'backgroundColor': '#f8f9fa', 'fontWeight': 'bold'}
     )
     
-    # Dropdown Options (Filter out Nulls to fix Dash error)
-    unique_vals = df[col].unique()
-    options = [{'label': str(val), 'value': val} for val in unique_vals if pd.notnull(val)]
+    # Dropdown Options (value_counts already excludes Nulls, which Dash rejects)
+    options = [{'label': str(val), 'value': val} for val in vc.index.tolist()]
     
     return table, options
 
 # 4. MAIN PROCESSING LOGIC
-@app.callback(
-    [Output('stored-data', 'data', allow_duplicate=True),
-     Output('preprocessing-alert', 'children')],
+# Each action takes the DataFrame plus its form values and returns (new_df, message).
+# Returning (None, message) means nothing was changed and the message is shown as a warning.
+# Actions get a shallow copy: they must assign columns (df[col] = ...), never write into existing arrays.
+
+# 4.1 Missing Values (UPDATED WITH FFILL/BFILL)
+def fill_take(series, forward=True):
+    # Position of the nearest non-null value above (ffill) or below (bfill) each row, then one take;
+    # integer indexing keeps extension dtypes (categorical, nullable) instead of going through object arrays
+    mask = series.notna().to_numpy()
+    n = len(mask)
+    if forward:
+        idx = np.where(mask, np.arange(n), 0)
+        np.maximum.accumulate(idx, out=idx)
+    else:
+        idx = np.where(mask, np.arange(n), n - 1)[::-1]
+        idx = np.minimum.accumulate(idx)[::-1]
+    return series.array.take(idx)
+
+def apply_missing(df, col, method):
+    if method in ('mean', 'median') and not pd.api.types.is_numeric_dtype(df[col]):
+        return None, "Column is not numeric. Convert type first."
+    if method == 'drop_rows': df = df.dropna(subset=[col])
+    elif method in ('mean', 'median'):
+        # Scalar and fill both run on the raw float array: one nan-reduction plus one np.where pass
+        arr = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        missing = np.isnan(arr)
+        if missing.any():
+            fill = np.nanmean(arr) if method == 'mean' else np.nanmedian(arr)
+            df[col] = np.where(missing, fill, arr)
+    elif method == 'mode': df[col] = df[col].fillna(df[col].mode()[0])
+    elif method == 'ffill':
+        df[col] = fill_take(df[col], forward=True)
+        return df, f"Filled {col} with value above (Forward Fill)"
+    elif method == 'bfill':
+        df[col] = fill_take(df[col], forward=False)
+        return df, f"Filled {col} with value below (Backward Fill)"
+    return df, f"Applied {method} to {col}"
+
+# 4.2 Types
+def apply_type(df, col, target):
+    if target == 'numeric' and pd.api.types.is_datetime64_any_dtype(df[col]):
+        # Dates parsed at upload: seconds since the epoch, with NaT -> NaN (to_numeric would give the int64 minimum)
+        df[col] = (df[col] - pd.Timestamp(0, tz=df[col].dt.tz)) / pd.Timedelta(seconds=1)
+    elif target == 'numeric': df[col] = pd.to_numeric(df[col], errors='coerce')
+    elif target == 'string': df[col] = df[col].astype(str)
+    elif target == 'datetime': df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df, f"Converted {col} to {target}"
+
+# 4.3 Drop
+def apply_drop(df, cols):
+    df = df.drop(columns=cols)
+    return df, f"Dropped columns: {len(cols)}"
+
+# 4.4 Clean Categories (Replace Value)
+def apply_replace(df, col, bad_val, new_val):
+    if not col or bad_val is None: return None, "Please select value to replace."
+    if new_val == bad_val: return None, "The correct value is the same as the selected value."
+    series = df[col]
+    if isinstance(series.dtype, pd.CategoricalDtype) and bad_val in series.cat.categories:
+        # Categorical columns: edit the categories (O(unique values)) instead of scanning every row
+        if new_val is None: df[col] = series.cat.remove_categories([bad_val])  # Empty input: cells become null
+        elif new_val not in series.cat.categories: df[col] = series.cat.rename_categories({bad_val: new_val})
+        else:
+            # The correct value already exists: repoint the codes and drop the old category
+            cats = series.cat.categories
+            codes = series.cat.codes.to_numpy()
+            codes = np.where(codes == cats.get_loc(bad_val), cats.get_loc(new_val), codes)
+            df[col] = pd.Categorical.from_codes(codes, dtype=series.dtype).remove_categories([bad_val])
+    else: df[col] = series.replace(bad_val, new_val)
+    return df, f"Replaced '{bad_val}' with '{new_val}' in {col}"
+
+# 4.5 Discretize
+@njit(cache=True)
+def uniform_bin(x, edges):
+    # Right-closed bins like pd.cut(labels=False): a side='left' search over the same edges
+    n = edges.size - 1
+    out = np.empty(x.size, np.float64)
+    for i in range(x.size):
+        if np.isnan(x[i]): out[i] = np.nan
+        else:
+            k = np.searchsorted(edges, x[i], side='left') - 1
+            out[i] = k if 0 <= k < n else np.nan
+    return out
+
+def apply_discretize(df, col, bins, strategy):
+    new_col = f"{col}_bins"
+    if strategy == 'uniform':
+        arr = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        lo, hi = (np.nanmin(arr), np.nanmax(arr)) if (~np.isnan(arr)).any() else (np.nan, np.nan)
+        # Constant or empty columns keep pd.cut's own edge handling
+        if not lo < hi: df[new_col] = pd.cut(df[col], bins=bins, labels=False)
+        else:
+            # Edges built exactly as pd.cut does: linspace in the column's own float precision,
+            # with the first edge lowered by 0.1% of the range
+            edge_type = np.float32 if df[col].dtype == np.float32 else np.float64
+            lo, hi = edge_type(lo), edge_type(hi)
+            edges = np.linspace(lo, hi, bins + 1, endpoint=True)
+            edges[0] -= (hi - lo) * edge_type(0.001)
+            codes = uniform_bin(arr, edges.astype(np.float64))
+            df[new_col] = codes if np.isnan(codes).any() else codes.astype(np.int64)
+    else: df[new_col] = pd.qcut(df[col], q=bins, labels=False, duplicates='drop')
+    return df, f"Binned {col}"
+
+# 4.6 Normalize
+# target='cpu': numba's parallel gufuncs are not safe to call from several server threads at once
+# unless the TBB threading layer is installed, and a concurrent call on the fallback layer aborts the process
+@guvectorize(['void(float64[:], float64[:])'], '(n)->(n)', target='cpu', cache=True)
+def zscore(x, out):
+    # Welford running mean/variance in one pass, then the transform, one column at a time.
+    # Matches StandardScaler: NaNs are skipped in the fit and stay NaN, a constant column becomes 0.
+    mean, m2, count = 0.0, 0.0, 0
+    for i in range(x.size):
+        if not np.isnan(x[i]):
+            count += 1
+            delta = x[i] - mean
+            mean += delta / count
+            m2 += delta * (x[i] - mean)
+    sd = (m2 / count) ** 0.5 if count > 0 else 0.0
+    if sd == 0.0: sd = 1.0
+    for i in range(x.size): out[i] = (x[i] - mean) / sd
+
+def apply_normalize(df, cols, method):
+    # One float64 block in, one out, written back in a single assignment
+    arr = df[cols].to_numpy(dtype=np.float64, copy=False)
+    if method == 'standard':
+        # Kernel runs along the last axis, so columns are passed as rows
+        out = np.empty_like(arr)
+        zscore(arr.T, out.T)
+        df[cols] = out
+    else: df[cols] = SCALERS[method]().fit_transform(arr)
+    return df, f"Normalized {len(cols)} columns using {method}"
+
+# 4.7 Encode
+def apply_encode(df, col, method):
+    if method == 'label':
+        # One hash pass, no sort and no string copy of the column; missing values stay missing
+        codes, _ = pd.factorize(df[col])
+        df[col] = np.where(codes == -1, np.nan, codes) if (codes == -1).any() else codes
+        return df, f"Label Encoded {col}"
+    # Scatter the factorized codes into a uint8 block (8x smaller than get_dummies' int64);
+    # missing values (code -1) get an all-zero row, as with get_dummies
+    # Categorical columns keep every category (unused ones included) in category order, like get_dummies
+    if isinstance(df[col].dtype, pd.CategoricalDtype): codes, cats = df[col].cat.codes.to_numpy(), df[col].cat.categories
+    else: codes, cats = pd.factorize(df[col], sort=True)
+    rows = np.flatnonzero(codes >= 0)
+    onehot = np.zeros((len(codes), len(cats)), dtype=np.uint8)
+    onehot[rows, codes[rows]] = 1
+    dummies = pd.DataFrame(onehot, columns=[f"{col}_{c}" for c in cats], index=df.index)
+    return pd.concat([df, dummies], axis=1, copy=False), f"One-Hot Encoded {col}"
+
+ACTIONS = {
+    'missing': apply_missing,
+    'type': apply_type,
+    'drop': apply_drop,
+    'replace': apply_replace,
+    'discretize': apply_discretize,
+    'normalize': apply_normalize,
+    'encode': apply_encode,
+}
+
+# Clientside dispatcher: packs the clicked button's form values into one small action request,
+# so the server callback below has a single input instead of one per button.
+app.clientside_callback(
+    """
+    function(b1, b2, b3, b4, b5, b6, b7,
+             missCol, missAction, typeCol, typeTarget, dropCols,
+             cleanCol, badVal, newVal, discCol, discBins, discStrat,
+             normCols, normMethod, encCol, encMethod) {
+        var ctx = window.dash_clientside.callback_context;
+        if (!ctx.triggered.length) { return window.dash_clientside.no_update; }
+        var requests = {
+            'btn-apply-missing': {action: 'missing', col: missCol, method: missAction},
+            'btn-apply-type': {action: 'type', col: typeCol, target: typeTarget},
+            'btn-apply-drop': {action: 'drop', cols: dropCols},
+            'btn-apply-replace': {action: 'replace', col: cleanCol, bad_val: badVal, new_val: newVal},
+            'btn-apply-disc': {action: 'discretize', col: discCol, bins: discBins, strategy: discStrat},
+            'btn-apply-norm': {action: 'normalize', cols: normCols, method: normMethod},
+            'btn-apply-enc': {action: 'encode', col: encCol, method: encMethod}
+        };
+        var request = requests[ctx.triggered[0].prop_id.split('.')[0]];
+        if (!request) { return window.dash_clientside.no_update; }
+        request.ts = Date.now(); // Repeating the same action must still count as a new request
+        return request;
+    }
+    """,
+    Output('action-request', 'data'),
     [Input('btn-apply-missing', 'n_clicks'),
      Input('btn-apply-type', 'n_clicks'),
      Input('btn-apply-drop', 'n_clicks'),
@@ -285,8 +539,7 @@ def update_clean_cat_options(col, json_data):
      Input('btn-apply-disc', 'n_clicks'),
      Input('btn-apply-norm', 'n_clicks'),
      Input('btn-apply-enc', 'n_clicks')],
-    [State('stored-data', 'data'),
-     State('missing-col-dropdown', 'value'), State('missing-action-radio', 'value'),
+    [State('missing-col-dropdown', 'value'), State('missing-action-radio', 'value'),
      State('type-col-dropdown', 'value'), State('type-target-dropdown', 'value'),
      State('drop-col-dropdown', 'value'),
      State('clean-cat-col-dropdown', 'value'), State('clean-cat-bad-value', 'value'), State('clean-cat-new-value', 'value'),
@@ -295,95 +548,49 @@ def update_clean_cat_options(col, json_data):
      State('enc-col-dropdown', 'value'), State('enc-method', 'value')],
     prevent_initial_call=True
 )
-def process_data(b1, b2, b3, b4, b5, b6, b7, json_data,
-                 miss_col, miss_action,
-                 type_col, type_target,
-                 drop_cols,
-                 clean_col, bad_val, new_val,
-                 disc_col, disc_bins, disc_strat,
-                 norm_cols, norm_method,
-                 enc_col, enc_method):
-    
-    if json_data is None: raise dash.exceptions.PreventUpdate
-    ctx = callback_context
-    if not ctx.triggered: raise dash.exceptions.PreventUpdate
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
 
-    df = parse_data(json_data)
-    msg = ""
-    alert_type = "alert alert-success"
+@app.callback(
+    [Output('stored-data', 'data', allow_duplicate=True),
+     Output('preprocessing-alert', 'children')],
+    [Input('action-request', 'data')],
+    [State('stored-data', 'data')],
+    prevent_initial_call=True
+)
+def process_data(request, store):
+    if store is None or request is None: raise dash.exceptions.PreventUpdate
+    params = {k: v for k, v in request.items() if k not in ('action', 'ts')}
+
+    df = parse_data(store)
+    if df is None: return dash.no_update, html.Div("Data expired. Please upload the file again.", className="alert alert-danger")
+    # The parsed DataFrame is shared by other callbacks. A shallow copy is enough because every action
+    # assigns new columns (or returns a new frame) instead of writing into the existing arrays.
+    df = df.copy(deep=False)
 
     try:
-        # 1. Missing Values (UPDATED WITH FFILL/BFILL)
-        if button_id == 'btn-apply-missing':
-            if miss_action == 'drop_rows': df.dropna(subset=[miss_col], inplace=True)
-            elif miss_action == 'mean': 
-                if pd.api.types.is_numeric_dtype(df[miss_col]): df[miss_col].fillna(df[miss_col].mean(), inplace=True)
-                else: return dash.no_update, html.Div("Column is not numeric. Convert type first.", className="alert alert-warning")
-            elif miss_action == 'median':
-                if pd.api.types.is_numeric_dtype(df[miss_col]): df[miss_col].fillna(df[miss_col].median(), inplace=True)
-                else: return dash.no_update, html.Div("Column is not numeric. Convert type first.", className="alert alert-warning")
-            elif miss_action == 'mode': df[miss_col].fillna(df[miss_col].mode()[0], inplace=True)
-            elif miss_action == 'ffill':
-                df[miss_col] = df[miss_col].ffill()
-                msg = f"Filled {miss_col} with value above (Forward Fill)"
-            elif miss_action == 'bfill':
-                df[miss_col] = df[miss_col].bfill()
-                msg = f"Filled {miss_col} with value below (Backward Fill)"
-            
-            if not msg: msg = f"Applied {miss_action} to {miss_col}"
-
-        # 2. Types
-        elif button_id == 'btn-apply-type':
-            if type_target == 'numeric': df[type_col] = pd.to_numeric(df[type_col], errors='coerce')
-            elif type_target == 'string': df[type_col] = df[type_col].astype(str)
-            elif type_target == 'datetime': df[type_col] = pd.to_datetime(df[type_col], errors='coerce')
-            msg = f"Converted {type_col} to {type_target}"
-
-        # 3. Drop
-        elif button_id == 'btn-apply-drop':
-            df.drop(columns=drop_cols, inplace=True)
-            msg = f"Dropped columns: {len(drop_cols)}"
-
-        # 4. Clean Categories (Replace Value)
-        elif button_id == 'btn-apply-replace':
-            if clean_col and bad_val is not None:
-                df[clean_col] = df[clean_col].replace(bad_val, new_val)
-                msg = f"Replaced '{bad_val}' with '{new_val}' in {clean_col}"
-            else:
-                return dash.no_update, html.Div("Please select value to replace.", className="alert alert-danger")
-
-        # 5. Discretize
-        elif button_id == 'btn-apply-disc':
-            new_col = f"{disc_col}_bins"
-            if disc_strat == 'uniform': df[new_col] = pd.cut(df[disc_col], bins=disc_bins, labels=False)
-            else: df[new_col] = pd.qcut(df[disc_col], q=disc_bins, labels=False, duplicates='drop')
-            msg = f"Binned {disc_col}"
-
-        # 6. Normalize
-        elif button_id == 'btn-apply-norm':
-            if norm_method == 'minmax': scaler = MinMaxScaler()
-            elif norm_method == 'standard': scaler = StandardScaler()
-            elif norm_method == 'robust': scaler = RobustScaler()
-            df[norm_cols] = scaler.fit_transform(df[norm_cols])
-            msg = f"Normalized {len(norm_cols)} columns using {norm_method}"
-
-        # 7. Encode
-        elif button_id == 'btn-apply-enc':
-            if enc_method == 'label':
-                df[enc_col] = LabelEncoder().fit_transform(df[enc_col].astype(str))
-                msg = f"Label Encoded {enc_col}"
-            elif enc_method == 'onehot':
-                dummies = pd.get_dummies(df[enc_col], prefix=enc_col, dtype=int)
-                df = pd.concat([df, dummies], axis=1)
-                msg = f"One-Hot Encoded {enc_col}"
-
-        return df.to_json(date_format='iso', orient='split'), html.Div(f"✅ {msg}", className=alert_type)
+        df, msg = ACTIONS[request['action']](df, **params)
+        if df is None: return dash.no_update, html.Div(msg, className="alert alert-warning")
+        return save_data(df, store), html.Div(f"✅ {msg}", className="alert alert-success")
 
     except Exception as e:
         return dash.no_update, html.Div(f"Error: {e}", className="alert alert-danger")
 
 # 5. Download Callback
+# Coarsest timestamp unit that still holds every value, so '10:30:00' is not written as '10:30:00.000'
+TIME_UNITS = [('second', 's'), ('millisecond', 'ms'), ('microsecond', 'us')]
+
+def write_csv(table, buf):
+    """Arrow CSV export that writes timestamps the way they were uploaded, not as '2020-01-01 00:00:00.000'."""
+    for i, field in enumerate(table.schema):
+        if not pa.types.is_timestamp(field.type): continue
+        col = table.column(i)
+        exact = lambda unit: pc.all(pc.equal(pc.floor_temporal(col, unit=unit), col)).as_py() is not False
+        if exact('day'): col = pc.cast(col, pa.date32())  # Dates without a time part stay plain dates
+        else:
+            unit = next((u for name, u in TIME_UNITS if exact(name)), 'ns')
+            col = pc.strftime(pc.cast(col, pa.timestamp(unit, field.type.tz)), format='%Y-%m-%d %H:%M:%S')
+        table = table.set_column(i, field.name, col)
+    pacsv.write_csv(table, buf)
+
 @app.callback(
     [Output("download-dataframe-csv", "data"), 
      Output("download-train-csv", "data"), 
@@ -395,20 +602,30 @@ def process_data(b1, b2, b3, b4, b5, b6, b7, json_data,
      State("split-size-slider", "value")],
     prevent_initial_call=True
 )
-def handle_downloads(b1, b2, json_data, target, size):
+def handle_downloads(b1, b2, store, target, size):
     ctx = callback_context
-    if not ctx.triggered or json_data is None: return None, None, None
+    if not ctx.triggered or store is None: return None, None, None
     btn = ctx.triggered[0]['prop_id'].split('.')[0]
-    df = parse_data(json_data)
     
     if btn == "btn-download":
-        return dcc.send_data_frame(df.to_csv, "cleaned_dataset.csv", index=False), None, None
+        # Stream the stored Parquet file straight to CSV with Arrow's C++ writer (no pandas round-trip)
+        path = frame_path(store['key'])
+        if not os.path.exists(path): return None, None, None
+        return dcc.send_bytes(lambda buf: write_csv(pq.read_table(path), buf), "cleaned_dataset.csv"), None, None
+    
+    df = parse_data(store)
+    if df is None: return None, None, None
     
     if btn == "btn-apply-split":
         if not target: return None, None, None
         try:
-            train, test = train_test_split(df, test_size=size, random_state=42)
-            return None, dcc.send_data_frame(train.to_csv, "train.csv", index=False), dcc.send_data_frame(test.to_csv, "test.csv", index=False)
+            # One seeded permutation and a take per side; test size rounds up like train_test_split
+            n_test = int(np.ceil(len(df) * size))
+            perm = np.random.default_rng(42).permutation(len(df))
+            train, test = df.take(perm[n_test:]), df.take(perm[:n_test])
+            # Same Arrow C++ CSV writer as the full download, instead of pandas' Python-level formatter
+            return (None, dcc.send_bytes(lambda buf: write_csv(to_arrow(train), buf), "train.csv"),
+                    dcc.send_bytes(lambda buf: write_csv(to_arrow(test), buf), "test.csv"))
         except Exception as e:
             print(e)
             return None, None, None
@@ -1,8 +1,49 @@
 from dash import dcc, html
 from dash.dependencies import Input, Output
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 from app import app
+from utils.store import load_frame
+
+# --- Large Dataset Limits ---
+# Above MAX_RAW_HIST_ROWS numeric histograms are binned on the server and sent as bars;
+# box/violin plots keep at most MAX_GROUP_POINTS random rows per color group.
+MAX_RAW_HIST_ROWS = 50000
+MAX_GROUP_POINTS = 10000
+
+# --- Helper Functions ---
+def binned_histogram(df, x_col, color_col, nbins):
+    """Histogram from np.histogram counts: one bar per bin instead of one JSON value per row."""
+    x = df[x_col].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(x)
+    # Shared edges, so overlaid groups line up bin for bin
+    edges = np.histogram_bin_edges(x[valid], bins=nbins)
+    centers = (edges[:-1] + edges[1:]) / 2
+
+    if color_col:
+        codes, names = pd.factorize(df[color_col])
+        groups = [(str(name), valid & (codes == i)) for i, name in enumerate(names)]
+    else: groups = [(x_col, valid)]
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure([
+        go.Bar(x=centers, y=np.histogram(x[mask], bins=edges)[0], name=name,
+               marker_color=palette[i % len(palette)], opacity=0.7)
+        for i, (name, mask) in enumerate(groups)
+    ])
+    fig.update_layout(barmode='overlay', showlegend=bool(color_col), legend_title_text=color_col, xaxis_title=x_col)
+    return fig
+
+def stratified_sample(df, color_col, n):
+    """At most n random rows per color group (or overall), so every group keeps its shape."""
+    if len(df) <= n: return df
+    if not color_col: return df.sample(n, random_state=0).sort_index()
+    if df[color_col].value_counts(dropna=False).max() <= n: return df
+    # Shuffle once, then keep each group's first n rows: no per-group apply. Sorting the kept rows
+    # back into file order keeps the groups (and legend) in the same order as the full data.
+    shuffled = df.sample(frac=1, random_state=0)
+    return shuffled[shuffled.groupby(color_col, observed=True, dropna=False).cumcount() < n].sort_index()
 
 # --- Layout ---
 layout = html.Div([
@@ -83,12 +124,12 @@ layout = html.Div([
      Output('uni-color-col', 'options')],
     [Input('stored-data', 'data')]
 )
-def populate_dropdowns(json_data):
-    if json_data is None: return [], []
+def populate_dropdowns(store):
+    if store is None: return [], []
     
     try:
-        df = pd.read_json(json_data, orient='split')
-        options = [{'label': col, 'value': col} for col in df.columns]
+        # Column names travel with the store, so the data itself is not needed here
+        options = [{'label': col, 'value': col} for col in store['cols']]
         return options, options
     except:
         return [], []
@@ -114,12 +155,13 @@ def toggle_settings(plot_type):
      Input('uni-options', 'value'),
      Input('stored-data', 'data')]
 )
-def update_graph(plot_type, x_col, color_col, nbins, options, json_data):
-    if json_data is None or x_col is None:
+def update_graph(plot_type, x_col, color_col, nbins, options, store):
+    if store is None or x_col is None:
         return {}
 
     try:
-        df = pd.read_json(json_data, orient='split')
+        # Only the plotted columns are read from the stored Parquet file
+        df = load_frame(store['key'], columns=tuple(dict.fromkeys(c for c in [x_col, color_col] if c)))
         
         # Check settings
         use_log = True if "log" in options else False
@@ -128,8 +170,16 @@ def update_graph(plot_type, x_col, color_col, nbins, options, json_data):
         fig = {}
 
         # --- LOGIC FOR PLOT TYPES ---
+
+        if plot_type in ('box', 'violin'): df = stratified_sample(df, color_col, MAX_GROUP_POINTS)
         
-        if plot_type == 'hist':
+        if plot_type == 'hist' and len(df) > MAX_RAW_HIST_ROWS and pd.api.types.is_numeric_dtype(df[x_col]):
+            # Large numeric column: bin on the server (no marginal box, it would need every row)
+            fig = binned_histogram(df, x_col, color_col, nbins)
+            fig.update_layout(title=f"Histogram of {x_col}", template="plotly_white", bargap=0.1, yaxis_title="Count")
+            if use_log: fig.update_yaxes(type='log')
+
+        elif plot_type == 'hist':
             # Histogram
             fig = px.histogram(
                 df, x=x_col, color=color_col, nbins=nbins,
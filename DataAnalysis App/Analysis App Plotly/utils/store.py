@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# --- Server-side Data Store ---
+# Each version of the DataFrame is persisted as a zstd-compressed Parquet file named by its key
+# (a hash of the upload, or STEP_PREFIX + a fresh id after each preprocessing step). The browser's
+# dcc.Store only holds the key; the file path is always derived here, never taken from the client.
+DATA_DIR = '/tmp/dash-data'
+STEP_PREFIX = 'step-'
+os.makedirs(DATA_DIR, exist_ok=True)
+# Eviction: files unused for MAX_FRAME_AGE seconds go, and at most MAX_STORED_FRAMES are kept
+# (least recently used first). A session whose file was evicted is asked to upload again.
+MAX_FRAME_AGE = 24 * 3600
+MAX_STORED_FRAMES = 100
+
+def frame_path(key):
+    return os.path.join(DATA_DIR, f"{os.path.basename(key)}.parquet")
+
+def to_arrow(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Mixed-type text columns (e.g. after replacing a number with text) are stored as strings
+        obj_cols = df.select_dtypes(include='object').columns
+        df = df.assign(**{c: df[c].where(df[c].isna(), df[c].astype(str)) for c in obj_cols})
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+# --- In-process Frame Cache ---
+# The most recently used DataFrames, keyed by (key, columns). Writes go through it too, so the
+# next preprocessing action (or plot) on a freshly saved version never decodes the Parquet file.
+MAX_FRAMES = 8
+_frames = OrderedDict()
+_frames_lock = threading.Lock()
+
+def remember_frame(key, columns, df):
+    with _frames_lock:
+        _frames[(key, columns)] = df
+        _frames.move_to_end((key, columns))
+        while len(_frames) > MAX_FRAMES: _frames.popitem(last=False)
+
+def downcast(df):
+    # Smallest dtype that holds each numeric column exactly: integers always shrink to fit their range,
+    # floats only move to float32 when no value changes (CSV decimals like 0.1 stay float64)
+    small = {}
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_integer_dtype(s): small[c] = pd.to_numeric(s, downcast='integer')
+        elif s.dtype == np.float64:
+            f32 = s.to_numpy().astype(np.float32)
+            if np.array_equal(f32, s.to_numpy(), equal_nan=True): small[c] = pd.Series(f32, index=s.index)
+    small = {c: s for c, s in small.items() if s.dtype != df[c].dtype}
+    return df.assign(**small) if small else df
+
+def frame_meta(df, table):
+    # Column metadata kept in the browser store: the dropdown options and the summary table are built from it.
+    # Null counts come from the Arrow table, where each column already carries its null_count.
+    num_mask = df.dtypes.map(lambda t: t.kind).isin(['i', 'u', 'f', 'c']).values
+    return {
+        'rows': table.num_rows,
+        'cols': list(df.columns),
+        'num_cols': list(df.columns[num_mask]),
+        'cat_cols': list(df.columns[~num_mask]),
+        'dtypes': df.dtypes.astype(str).tolist(),
+        'nulls': [col.null_count for col in table.columns]
+    }
+
+def set_frame(key, df):
+    """Persists df under key and returns its frame_meta."""
+    table = to_arrow(downcast(df))
+    # Write to a private temp file and swap it in, so readers of the same key never see a partial file
+    tmp = f"{frame_path(key)}.{uuid.uuid4().hex}.tmp"
+    pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, frame_path(key))
+    evict_frames()
+    # Cache what a disk read would return (Arrow round-trip), so hits and misses see the same dtypes
+    df = table.to_pandas()
+    remember_frame(key, None, df)
+    return frame_meta(df, table)
+
+def stored_meta(key):
+    """frame_meta of an already stored key (None if it is not stored), without re-parsing its source."""
+    try: table = pq.read_table(frame_path(key))
+    except FileNotFoundError: return None
+    touch_frame(key)
+    df = table.to_pandas()
+    remember_frame(key, None, df)
+    return frame_meta(df, table)
+
+def delete_frame(key):
+    with _frames_lock:
+        for cached in [k for k in _frames if k[0] == key]: del _frames[cached]
+    try: os.remove(frame_path(key))
+    except FileNotFoundError: pass
+
+def touch_frame(key):
+    # The file's mtime doubles as its last-used time for evict_frames
+    try: os.utime(frame_path(key))
+    except FileNotFoundError: pass
+
+def evict_frames():
+    now = time.time()
+    files = sorted((e.stat().st_mtime, e.name) for e in os.scandir(DATA_DIR) if e.name.endswith('.parquet'))
+    for i, (mtime, name) in enumerate(files):
+        if now - mtime > MAX_FRAME_AGE or i < len(files) - MAX_STORED_FRAMES:
+            delete_frame(name[:-len('.parquet')])
+
+def get_frame(key, columns=None):
+    # Parquet is columnar: passing `columns` reads only those columns from disk
+    path = frame_path(key)
+    if not os.path.exists(path): return None
+    return pq.read_table(path, columns=columns).to_pandas()
+
+def load_frame(key, columns=None):
+    """
+    Cached get_frame (columns as a tuple). Keys are immutable (every change gets a new key), so
+    callbacks firing on the same store, or a slider being dragged, share one decoded DataFrame
+    instead of each reading it from disk again. The result is shared: never modify it in place.
+    """
+    touch_frame(key)
+    with _frames_lock:
+        df = _frames.get((key, columns))
+        if df is not None: _frames.move_to_end((key, columns)); return df
+        full = _frames.get((key, None))
+    # A column subset of a cached full frame is sliced in memory rather than read from disk
+    if full is not None: df = full[list(columns)]
+    else: df = get_frame(key, columns=list(columns) if columns else None)
+    if df is None: raise KeyError(f"No stored data for key {key}")  # Not cached, so a re-upload is picked up
+    remember_frame(key, columns, df)
+    return df
\ No newline at end of file